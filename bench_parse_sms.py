@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# bench_parse_sms.py
+
+"""
+Micro-benchmark untuk parser dan decoder SMS.
+
+Membuat dump `AT+CMGL` sintetis (termasuk pesan status "RTU Power On")
+dalam berbagai ukuran, lalu mengukur waktu, throughput dan alokasi memori
+untuk parse_sms, convert_timestamp, extract_sensor_data dan render teks OLED
+(render_message, bagian display_message tanpa I/O ke layar).
+
+    python bench_parse_sms.py                    # jalankan dan bandingkan
+    python bench_parse_sms.py --save-baseline    # simpan hasil sebagai baseline
+
+main.parse_sms, extract_sensor_data dan render_message hanya ada di main.py,
+yang butuh hardware Raspberry Pi (OLED, GPIO); di mesin lain dilewati.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from parse_sms import parse_sms, convert_timestamp
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json"
+)
+DEFAULT_SIZES = [10, 100, 1000, 5000]
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.25
+
+# Nomor stasiun dan mode sensor, sama seperti di main.py
+STATIONS = [
+    ("+628115013798", "climatology"),
+    ("+6282195431503", "floating_hd"),
+    ("+628115113510", "spas"),
+    ("+6282213735684", "spas"),
+    ("+628115113503", "spas"),
+]
+MODE_SENSOR_COUNT = {"climatology": 6, "floating_hd": 3, "spas": 4}
+NOISE_STATIONS = ["+628115010756", "+6282195446469"]
+
+
+def generate_rtu_payload(mode, rng):
+    """Generate an RTU sensor payload for the given mode"""
+    lines = [f"DIN0:{rng.randint(0, 20)};"]
+    for sensor in range(MODE_SENSOR_COUNT[mode]):
+        lines.append(f"AIN{sensor}:{rng.uniform(0, 100):.2f},Normal;")
+    return "\n".join(lines)
+
+
+def generate_status_payload(rng, sent):
+    """Generate a noisy 'RTU Power On' status message"""
+    return "\n".join(
+        [
+            "RTU Power On;",
+            "ID:0001;",
+            "Status:Armed;",
+            f"GSM Signal Value:{rng.randint(10, 31)};",
+            f"Power:{rng.randint(5, 14):02d};",
+            f"IMEI:{rng.randint(10**14, 10**15 - 1)};",
+            "Version:V2.0.7_EN_4;",
+            sent.strftime("%Y-%m-%d %H:%M;"),
+        ]
+    )
+
+
+def generate_modem_timestamp(sent):
+    """Format a datetime the way the modem reports it ('25/04/29,08:00:42+28')"""
+    return sent.strftime("%y/%m/%d,%H:%M:%S") + "+28"
+
+
+def generate_cmgl_dump(count, noise_ratio=0.3, seed=0):
+    """Generate a synthetic `AT+CMGL` response with `count` messages"""
+    rng = random.Random(seed)
+    sent = datetime(2025, 4, 29, 7, 0, 0)
+    entries = []
+    for index in range(count):
+        sent += timedelta(seconds=rng.randint(30, 600))
+        if rng.random() < noise_ratio:
+            phone = rng.choice(NOISE_STATIONS)
+            message = generate_status_payload(rng, sent)
+        else:
+            phone, mode = rng.choice(STATIONS)
+            message = generate_rtu_payload(mode, rng)
+        entries.append(
+            f'+CMGL: {index},"REC UNREAD","{phone}",,'
+            f'"{generate_modem_timestamp(sent)}"\n{message}\n'
+        )
+    return "\n" + "".join(entries)
+
+
+def load_main_functions():
+    """Import the decoders that only live in main.py, if this machine can"""
+    try:
+        import main
+    except Exception as e:
+        logging.warning(f"main.py tidak bisa di-import, dilewati: {e}")
+        return None
+    return main
+
+
+def measure(func, repeat):
+    """Time `func` over `repeat` runs and record its peak allocation"""
+    func()  # warm-up (regex cache, lazy imports)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    # Alokasi diukur terpisah karena tracemalloc memperlambat eksekusi
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(timings), statistics.median(timings), peak
+
+
+def build_cases(sizes, main_module):
+    """Build (name, item_count, callable) benchmark cases for every size"""
+    cases = []
+    for size in sizes:
+        dump = generate_cmgl_dump(size, seed=size)
+        cases.append((f"parse_sms[{size}]", size, lambda d=dump: parse_sms(d)))
+        if main_module is not None:
+            # Gateway memakai parse_sms versi main.py (hanya "REC UNREAD")
+            cases.append(
+                (
+                    f"main.parse_sms[{size}]",
+                    size,
+                    lambda d=dump: main_module.parse_sms(d),
+                )
+            )
+
+        rng = random.Random(size)
+        timestamps = [
+            f"25/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d},"
+            f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:"
+            f"{rng.randint(0, 59):02d}+28"
+            for _ in range(size)
+        ]
+        cases.append(
+            (
+                f"convert_timestamp[{size}]",
+                size,
+                lambda t=timestamps: [convert_timestamp(ts) for ts in t],
+            )
+        )
+
+        if main_module is None:
+            continue
+
+        payloads = [
+            (generate_rtu_payload(mode, rng), mode)
+            for _, mode in (rng.choice(STATIONS) for _ in range(size))
+        ]
+        cases.append(
+            (
+                f"extract_sensor_data[{size}]",
+                size,
+                lambda p=payloads: [
+                    main_module.extract_sensor_data(m, mode) for m, mode in p
+                ],
+            )
+        )
+
+    if main_module is not None:
+        # Hanya layout teks dan render ImageDraw; I2C ke OLED tidak disentuh
+        # supaya tidak mengganggu service gateway yang sedang berjalan
+        lines = [
+            f"Data berhasil dikirim {phone}" for phone, _ in STATIONS
+        ] + ["Internet terputus. Menunggu koneksi...", "Menunggu SMS baru..."]
+        cases.append(
+            (
+                f"render_message[{len(lines)}]",
+                len(lines),
+                lambda texts=lines: [
+                    main_module.render_message(text) for text in texts
+                ],
+            )
+        )
+
+    return cases
+
+
+def run_benchmarks(sizes, repeat, main_module):
+    """Run every case and return results keyed by case name"""
+    results = {}
+    for name, items, func in build_cases(sizes, main_module):
+        best, median, peak = measure(func, repeat)
+        results[name] = {
+            "best_s": best,
+            "median_s": median,
+            "items_per_s": items / best if best > 0 else 0.0,
+            "peak_bytes": peak,
+        }
+        print(
+            f"{name:<28} best {best * 1000:9.3f} ms  "
+            f"median {median * 1000:9.3f} ms  "
+            f"{results[name]['items_per_s']:12.0f} item/s  "
+            f"peak {peak / 1024:9.1f} KiB"
+        )
+    return results
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Return a list of regression descriptions against the stored baseline"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+
+        min_throughput = previous["items_per_s"] * (1 - tolerance)
+        if current["items_per_s"] < min_throughput:
+            regressions.append(
+                f"{name}: throughput {current['items_per_s']:.0f} item/s "
+                f"< baseline {previous['items_per_s']:.0f} item/s"
+            )
+
+        max_peak = previous["peak_bytes"] * (1 + tolerance)
+        if current["peak_bytes"] > max_peak:
+            regressions.append(
+                f"{name}: peak {current['peak_bytes']} B "
+                f"> baseline {previous['peak_bytes']} B"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="jumlah pesan per dump",
+    )
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="toleransi regresi relatif (0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="simpan hasil ke file baseline alih-alih membandingkan",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
+
+    results = run_benchmarks(args.sizes, args.repeat, load_main_functions())
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+        print(f"Baseline disimpan ke {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Baseline belum ada, jalankan dengan --save-baseline")
+        return 0
+
+    with open(args.baseline, "r") as file:
+        baseline = json.load(file)
+
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESI: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
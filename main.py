@@ -19,6 +19,7 @@ from PIL import Image, ImageDraw, ImageFont
 import fcntl
 import sys
 import urllib3
+import sms_archive
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -44,6 +45,10 @@ PORT = "/dev/ttyUSB0"  # Adjust according to your modem's port
 BAUDRATE = 115200
 SMS_LIMIT = 15
 SMS_STORAGE_PATH = "/home/pi/SMS/sms_storage"
+ARCHIVE_PATH = os.path.join(SMS_STORAGE_PATH, "archive")
+ARCHIVE_RETENTION_DAYS = 365  # None = simpan arsip selamanya
+MIGRATION_BATCH_SIZE = 200  # Jumlah file sended/ lama yang diarsipkan per loop
+MIGRATION_RETRY_DELAY = 300  # Detik menunggu setelah migrasi gagal
 
 # OLED Configuration
 OLED_WIDTH = 128
@@ -54,6 +59,11 @@ oled = Adafruit_SSD1306.SSD1306_128_64(rst=None)
 font_path = "/home/pi/SMS/fonts/Tahoma.ttf"
 font = ImageFont.truetype(font_path, 11)
 
+# Status migrasi folder sended/ lama ke arsip
+migration_done = False
+migrated_total = 0
+migration_retry_at = 0
+
 
 def initialize_directories():
     """Ensure necessary directories exist"""
@@ -61,9 +71,53 @@ def initialize_directories():
     os.makedirs(
         os.path.join(SMS_STORAGE_PATH, "sended"), exist_ok=True
     )  # Folder untuk SMS terkirim
+    os.makedirs(ARCHIVE_PATH, exist_ok=True)
     logging.info(f"Initialized directory: {SMS_STORAGE_PATH}")
 
 
+def migrate_sended_batch():
+    """Move one batch of old `sended/` files into the archive"""
+    global migration_done, migrated_total, migration_retry_at
+    if migration_done or time.time() < migration_retry_at:
+        return
+
+    try:
+        migrated, failed, more = sms_archive.migrate_folder(
+            ARCHIVE_PATH,
+            os.path.join(SMS_STORAGE_PATH, "sended"),
+            limit=MIGRATION_BATCH_SIZE,
+        )
+    except Exception as e:
+        logging.error(f"Archive migration error: {e}")
+        migration_retry_at = time.time() + MIGRATION_RETRY_DELAY
+        return
+
+    if migrated:
+        migrated_total += migrated
+        logging.info(
+            f"Migrasi arsip: {migrated} SMS lama dipindahkan "
+            f"(total {migrated_total})"
+        )
+
+    if failed:
+        # Mis. SD card penuh: coba lagi nanti, jangan dianggap selesai
+        migration_retry_at = time.time() + MIGRATION_RETRY_DELAY
+        logging.warning(
+            f"Migrasi arsip: {failed} SMS gagal, "
+            f"dicoba lagi dalam {MIGRATION_RETRY_DELAY} detik"
+        )
+    elif not more:
+        migration_done = True
+        if migrated_total:
+            logging.info(f"Migrasi arsip selesai: {migrated_total} SMS lama")
+
+
+def request_migration():
+    """Schedule another migration pass after a file lands in `sended/`"""
+    global migration_done
+    migration_done = False
+
+
 def enforce_single_instance():
     global lockfile
     lockfile = open(LOCK_FILE_PATH, "w")
@@ -74,28 +128,34 @@ def enforce_single_instance():
         sys.exit(1)
 
 
+def render_message(line1):
+    """Render centered, wrapped text into an OLED-sized image"""
+    image = Image.new("1", (OLED_WIDTH, OLED_HEIGHT))
+    draw = ImageDraw.Draw(image)
+
+    char_width = font.getlength("A")
+    char_height = font.getbbox("A")[3]
+    max_chars_per_line = OLED_WIDTH // char_width
+
+    wrapped_text = textwrap.wrap(line1, width=max_chars_per_line)
+    total_text_height = len(wrapped_text) * char_height
+    y_offset = (OLED_HEIGHT - total_text_height) // 2
+
+    for line in wrapped_text:
+        text_width = font.getlength(line)
+        x_offset = (OLED_WIDTH - text_width) // 2
+        draw.text((x_offset, y_offset), line, font=font, fill=255)
+        y_offset += char_height
+
+    return image
+
+
 def display_message(line1, line2=""):
     """Display messages on OLED screen"""
     try:
         oled.begin()
         oled.clear()
-        image = Image.new("1", (OLED_WIDTH, OLED_HEIGHT))
-        draw = ImageDraw.Draw(image)
-
-        char_width = font.getlength("A")
-        char_height = font.getbbox("A")[3]
-        max_chars_per_line = OLED_WIDTH // char_width
-
-        wrapped_text = textwrap.wrap(line1, width=max_chars_per_line)
-        total_text_height = len(wrapped_text) * char_height
-        y_offset = (OLED_HEIGHT - total_text_height) // 2
-
-        for line in wrapped_text:
-            text_width = font.getlength(line)
-            x_offset = (OLED_WIDTH - text_width) // 2
-            draw.text((x_offset, y_offset), line, font=font, fill=255)
-            y_offset += char_height
-
+        image = render_message(line1)
         oled.image(image)
         oled.display()
     except Exception as e:
@@ -362,11 +422,24 @@ def send_telemetry(access_token, phone_number, sensor_data, filename, sent_at):
             logging.info(f"Data sent successfully for {phone_number}")
             logging.info("===========================================")
             display_message(f"Data berhasil dikirim {phone_number}")
-            dest_path = os.path.join(
-                SMS_STORAGE_PATH, "sended", os.path.basename(filename)
-            )
-            shutil.move(filename, dest_path)
-            logging.info(f"SMS dipindahkan ke: {dest_path}")
+            if not sms_archive.archive_sms(
+                ARCHIVE_PATH, filename, phone_number, sent_at
+            ):
+                # Mis. SD card penuh: pindahkan (rename, tanpa butuh ruang)
+                # ke sended/ supaya tidak dikirim ulang oleh process_stored_sms
+                dest_path = os.path.join(
+                    SMS_STORAGE_PATH, "sended", os.path.basename(filename)
+                )
+                try:
+                    shutil.move(filename, dest_path)
+                    logging.warning(f"Arsip gagal, SMS dipindahkan ke: {dest_path}")
+                    request_migration()
+                except Exception as e:
+                    logging.error(
+                        f"Arsip gagal dan SMS tidak bisa dipindahkan, "
+                        f"akan terkirim ulang: {filename} ({e})"
+                    )
+                    display_message("Arsip SMS gagal! Cek SD card")
             return True
         else:
             logging.error(f"Telemetry send error: {response.text}")
@@ -474,6 +547,10 @@ def main():
                 if sms_count >= SMS_LIMIT:
                     delete_all_sms()
 
+                sms_archive.apply_retention(ARCHIVE_PATH, ARCHIVE_RETENTION_DAYS)
+
+            migrate_sended_batch()
+
             logging.info("Waiting for new SMS...")
             display_message("Menunggu SMS baru...")
             time.sleep(10)
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+# sms_archive.py
+
+"""
+Arsip SMS terkirim dalam segmen harian yang append-only.
+
+Setiap hari punya dua file di folder arsip:
+
+    YYYYMMDD.seg  record SMS, masing-masing dikompres zlib secara terpisah
+    YYYYMMDD.idx  satu baris per record: timestamp, nomor, offset, panjang
+
+Karena setiap record dikompres sendiri, lookup cukup membaca index lalu
+seek ke offset record tanpa mendekompres seluruh segmen.
+
+    python sms_archive.py lookup --phone +628115113510 --start 2025-04-29
+    python sms_archive.py export hasil.csv --start 2025-04-01 --end 2025-04-30
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import zlib
+from datetime import datetime, timedelta
+
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+DEFAULT_ARCHIVE_PATH = "/home/pi/SMS/sms_storage/archive"
+QUARANTINE_DIRNAME = "rusak"
+
+# Kamus awal zlib supaya SMS pendek tetap terkompres dengan baik.
+# JANGAN diubah: record lama hanya bisa dibaca dengan kamus yang sama.
+ZDICT = (
+    b'{"phone_number": "+628", "timestamp": "20", "message": "'
+    b"DIN0:0;\\nAIN0:0.00,Normal;\\nAIN1:0.00,Normal;\\n"
+    b"AIN2:0.00,Normal;\\nAIN3:0.00,Normal;\\nAIN4:0.00,Normal;\\n"
+    b'AIN5:0.00,Normal;", "filename": "'
+)
+
+
+def _segment_day(timestamp):
+    """Return the segment name ('YYYYMMDD') for a 'YYYY-MM-DD HH:MM:SS' string"""
+    return datetime.strptime(timestamp, TIMESTAMP_FORMAT).strftime("%Y%m%d")
+
+
+def _compress(record):
+    compressor = zlib.compressobj(zdict=ZDICT)
+    payload = json.dumps(record).encode()
+    return compressor.compress(payload) + compressor.flush()
+
+
+def _decompress(data):
+    decompressor = zlib.decompressobj(zdict=ZDICT)
+    return json.loads(decompressor.decompress(data) + decompressor.flush())
+
+
+def _read_index(archive_dir, day):
+    """Read the index entries (timestamp, phone, offset, length) of one segment"""
+    entries = []
+    index_path = os.path.join(archive_dir, day + INDEX_SUFFIX)
+    if not os.path.exists(index_path):
+        return entries
+
+    with open(index_path, "r") as file:
+        for line in file:
+            parts = line.rstrip("\n").split("\t")
+            if not line.endswith("\n") or len(parts) != 4:
+                # Baris terpotong karena listrik mati saat menulis
+                continue
+            timestamp, phone_number, offset, length = parts
+            try:
+                entries.append((timestamp, phone_number, int(offset), int(length)))
+            except ValueError:
+                continue
+    return entries
+
+
+def _repair_index(index_path):
+    """Truncate a torn last line so the next append starts on a fresh line"""
+    if not os.path.exists(index_path):
+        return
+
+    with open(index_path, "rb+") as index:
+        size = index.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        index.seek(size - 1)
+        if index.read(1) == b"\n":
+            return
+
+        # Cari akhir baris utuh terakhir lalu buang sisanya
+        index.seek(0)
+        data = index.read()
+        keep = data.rfind(b"\n") + 1
+        index.truncate(keep)
+        index.flush()
+        os.fsync(index.fileno())
+        logging.warning(
+            f"Baris index terpotong dibuang dari {index_path} ({size - keep} byte)"
+        )
+
+
+def _list_days(archive_dir):
+    """List segment days present in the archive, oldest first"""
+    if not os.path.isdir(archive_dir):
+        return []
+    return sorted(
+        name[: -len(SEGMENT_SUFFIX)]
+        for name in os.listdir(archive_dir)
+        if name.endswith(SEGMENT_SUFFIX)
+    )
+
+
+def append_record(archive_dir, phone_number, timestamp, message, filename=""):
+    """Append one SMS to the daily segment and its index"""
+    os.makedirs(archive_dir, exist_ok=True)
+    day = _segment_day(timestamp)
+    data = _compress(
+        {
+            "phone_number": phone_number,
+            "timestamp": timestamp,
+            "message": message,
+            "filename": filename,
+        }
+    )
+
+    segment_path = os.path.join(archive_dir, day + SEGMENT_SUFFIX)
+    with open(segment_path, "ab") as segment:
+        offset = segment.tell()
+        segment.write(data)
+        segment.flush()
+        os.fsync(segment.fileno())
+
+    # Index ditulis setelah data aman di segmen; kalau gagal di tengah,
+    # sisa byte di segmen hanya jadi sampah yang tidak terindeks.
+    index_path = os.path.join(archive_dir, day + INDEX_SUFFIX)
+    _repair_index(index_path)
+    with open(index_path, "a") as index:
+        index.write(f"{timestamp}\t{phone_number}\t{offset}\t{len(data)}\n")
+        index.flush()
+        os.fsync(index.fileno())
+
+
+def _is_archived(archive_dir, phone_number, timestamp, filename):
+    """Check whether the record of `filename` is already in its segment"""
+    day = _segment_day(timestamp)
+    entries = [
+        (offset, length)
+        for entry_ts, phone, offset, length in _read_index(archive_dir, day)
+        if entry_ts == timestamp and phone == phone_number
+    ]
+    if not entries:
+        return False
+
+    with open(os.path.join(archive_dir, day + SEGMENT_SUFFIX), "rb") as segment:
+        for offset, length in entries:
+            segment.seek(offset)
+            try:
+                record = _decompress(segment.read(length))
+            except (zlib.error, ValueError):
+                continue
+            if record.get("filename") == filename:
+                return True
+    return False
+
+
+def _archive_file(archive_dir, filepath, phone_number, timestamp):
+    """
+    Append `filepath` to the archive and delete it. A retry after a failed
+    delete does not append the record a second time.
+    """
+    filename = os.path.basename(filepath)
+    if _is_archived(archive_dir, phone_number, timestamp, filename):
+        logging.info(f"SMS sudah ada di arsip, tidak ditulis ulang: {filename}")
+    else:
+        with open(filepath, "r") as file:
+            message = file.read()
+        append_record(archive_dir, phone_number, timestamp, message, filename)
+
+    try:
+        os.remove(filepath)
+    except OSError as e:
+        raise OSError(f"SMS sudah diarsipkan tapi file gagal dihapus: {e}") from e
+    logging.info(f"SMS diarsipkan ke segmen {_segment_day(timestamp)}")
+
+
+def archive_sms(archive_dir, filepath, phone_number, timestamp):
+    """Move a delivered SMS file into the archive, replacing shutil.move"""
+    try:
+        _archive_file(archive_dir, filepath, phone_number, timestamp)
+        return True
+    except Exception as e:
+        logging.error(f"SMS archive error: {e}")
+        return False
+
+
+def lookup(archive_dir, phone_number=None, start=None, end=None):
+    """
+    Yield archived records, optionally filtered by station and time range.
+    `start` and `end` are inclusive datetimes.
+    """
+    start_day = start.strftime("%Y%m%d") if start else None
+    end_day = end.strftime("%Y%m%d") if end else None
+    start_ts = start.strftime(TIMESTAMP_FORMAT) if start else None
+    end_ts = end.strftime(TIMESTAMP_FORMAT) if end else None
+
+    for day in _list_days(archive_dir):
+        if (start_day and day < start_day) or (end_day and day > end_day):
+            continue
+
+        entries = [
+            (offset, length)
+            for timestamp, phone, offset, length in _read_index(archive_dir, day)
+            if (phone_number is None or phone == phone_number)
+            and (start_ts is None or timestamp >= start_ts)
+            and (end_ts is None or timestamp <= end_ts)
+        ]
+        if not entries:
+            continue
+
+        with open(os.path.join(archive_dir, day + SEGMENT_SUFFIX), "rb") as segment:
+            for offset, length in entries:
+                segment.seek(offset)
+                try:
+                    record = _decompress(segment.read(length))
+                except (zlib.error, ValueError) as e:
+                    logging.error(f"Record arsip rusak di {day}@{offset}: {e}")
+                    continue
+                yield record
+
+
+def export_csv(archive_dir, output_path, phone_number=None, start=None, end=None):
+    """Export archived records to a CSV file, returns the number of rows"""
+    count = 0
+    with open(output_path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["timestamp", "phone_number", "message"])
+        for record in lookup(archive_dir, phone_number, start, end):
+            writer.writerow(
+                [record["timestamp"], record["phone_number"], record["message"]]
+            )
+            count += 1
+    logging.info(f"{count} SMS diekspor ke {output_path}")
+    return count
+
+
+def apply_retention(archive_dir, retention_days, now=None):
+    """Delete segments older than `retention_days` (None keeps everything)"""
+    if retention_days is None:
+        return 0
+
+    now = now or datetime.now()
+    cutoff = (now - timedelta(days=retention_days)).strftime("%Y%m%d")
+    removed = 0
+    try:
+        days = _list_days(archive_dir)
+    except OSError as e:
+        logging.error(f"Archive retention error: {e}")
+        return removed
+
+    for day in days:
+        if day >= cutoff:
+            break
+        try:
+            for suffix in (SEGMENT_SUFFIX, INDEX_SUFFIX):
+                path = os.path.join(archive_dir, day + suffix)
+                if os.path.exists(path):
+                    os.remove(path)
+        except OSError as e:
+            logging.error(f"Archive retention error on segment {day}: {e}")
+            continue
+        removed += 1
+        logging.info(f"Segmen arsip {day} dihapus (retensi {retention_days} hari)")
+    return removed
+
+
+def _quarantine(folder, filename, reason):
+    """Move a file that can never be archived out of the migration's way"""
+    quarantine_dir = os.path.join(folder, QUARANTINE_DIRNAME)
+    os.makedirs(quarantine_dir, exist_ok=True)
+    os.replace(os.path.join(folder, filename), os.path.join(quarantine_dir, filename))
+    logging.warning(f"File tidak bisa diarsipkan, dikarantina: {filename} ({reason})")
+
+
+def migrate_folder(archive_dir, folder, limit=None):
+    """
+    Roll loose files from the old `sended/` folder into the archive.
+
+    At most `limit` files are attempted per call so the caller can spread
+    a large backlog over several loop iterations. Files that can never be
+    archived (unknown name, unreadable content) go to `folder/rusak/`.
+    An OSError (e.g. SD card full) stops the batch so the caller can retry
+    later. Returns (migrated, failed, more): `failed` counts those retryable
+    errors and `more` tells whether files are still left in `folder`.
+    """
+    migrated = 0
+    failed = 0
+    if not os.path.isdir(folder):
+        return migrated, failed, False
+
+    attempted = 0
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            if limit is not None and attempted >= limit:
+                return migrated, failed, True
+
+            filename = entry.name
+            try:
+                # Nama file: YYYYMMDD_HHMMSS_+62xxxx.txt
+                timestamp = datetime.strptime(filename[:15], "%Y%m%d_%H%M%S")
+                phone_number = filename[16:].rsplit(".", 1)[0]
+            except ValueError as e:
+                _quarantine(folder, filename, e)
+                continue
+
+            attempted += 1
+            try:
+                _archive_file(
+                    archive_dir,
+                    entry.path,
+                    phone_number,
+                    timestamp.strftime(TIMESTAMP_FORMAT),
+                )
+                migrated += 1
+            except OSError as e:
+                logging.error(f"SMS archive error: {e}")
+                failed += 1
+                return migrated, failed, True
+            except ValueError as e:
+                # Mis. isi file bukan teks yang valid
+                _quarantine(folder, filename, e)
+    return migrated, failed, False
+
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE_PATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    lookup_parser = subparsers.add_parser("lookup", help="tampilkan SMS arsip")
+    export_parser = subparsers.add_parser("export", help="ekspor SMS arsip ke CSV")
+    export_parser.add_argument("output", help="path file CSV")
+    for subparser in (lookup_parser, export_parser):
+        subparser.add_argument("--phone", help="nomor stasiun, mis. +628115113510")
+        subparser.add_argument(
+            "--start", type=_parse_date, help="tanggal awal YYYY-MM-DD"
+        )
+        subparser.add_argument(
+            "--end", type=_parse_date, help="tanggal akhir YYYY-MM-DD (inklusif)"
+        )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    # Tanggal akhir mencakup seluruh hari itu
+    end = args.end + timedelta(days=1, seconds=-1) if args.end else None
+
+    if args.command == "export":
+        export_csv(args.archive, args.output, args.phone, args.start, end)
+        return 0
+
+    count = 0
+    for record in lookup(args.archive, args.phone, args.start, end):
+        print(f"{record['timestamp']}  {record['phone_number']}")
+        print(record["message"].strip())
+        print()
+        count += 1
+    print(f"{count} SMS ditemukan")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+# test_bench_parse_sms.py
+
+import unittest
+from bench_parse_sms import generate_cmgl_dump, compare_with_baseline
+from parse_sms import parse_sms
+
+
+class TestBenchParseSMS(unittest.TestCase):
+    def test_generate_cmgl_dump(self):
+        result = parse_sms(generate_cmgl_dump(50, noise_ratio=0))
+        self.assertEqual(len(result), 50)
+
+        dump = generate_cmgl_dump(50, noise_ratio=1)
+        self.assertEqual(dump.count("RTU Power On"), 50)
+        self.assertEqual(parse_sms(dump), [])
+
+    def test_compare_with_baseline(self):
+        baseline = {"parse_sms[10]": {"items_per_s": 1000.0, "peak_bytes": 1000}}
+
+        within = {"parse_sms[10]": {"items_per_s": 800.0, "peak_bytes": 1200}}
+        self.assertEqual(compare_with_baseline(within, baseline, 0.25), [])
+
+        slower = {"parse_sms[10]": {"items_per_s": 700.0, "peak_bytes": 1000}}
+        regressions = compare_with_baseline(slower, baseline, 0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("throughput", regressions[0])
+
+        bigger = {"parse_sms[10]": {"items_per_s": 1000.0, "peak_bytes": 1300}}
+        regressions = compare_with_baseline(bigger, baseline, 0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("peak", regressions[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
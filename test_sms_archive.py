@@ -0,0 +1,232 @@
+# test_sms_archive.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import sms_archive
+
+
+class TestSMSArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.archive_dir = os.path.join(self.tmpdir, "archive")
+
+        sms_archive.append_record(
+            self.archive_dir,
+            "+628115113510",
+            "2025-04-29 08:00:42",
+            "AIN0:0.38,Normal;\nAIN1:4.02,Normal;",
+        )
+        sms_archive.append_record(
+            self.archive_dir,
+            "+628115013798",
+            "2025-04-29 09:14:18",
+            "AIN0:0.00,Normal;\nAIN1:0.01,Normal;",
+        )
+        sms_archive.append_record(
+            self.archive_dir,
+            "+628115113510",
+            "2025-04-30 07:57:31",
+            "DIN0:0;\nAIN0:0.10,Normal;",
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_daily_segments(self):
+        self.assertEqual(
+            sorted(os.listdir(self.archive_dir)),
+            ["20250429.idx", "20250429.seg", "20250430.idx", "20250430.seg"],
+        )
+
+    def test_lookup_by_station_and_time(self):
+        result = list(sms_archive.lookup(self.archive_dir, "+628115113510"))
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0]["timestamp"], "2025-04-29 08:00:42")
+        self.assertEqual(result[1]["message"], "DIN0:0;\nAIN0:0.10,Normal;")
+
+        result = list(
+            sms_archive.lookup(
+                self.archive_dir,
+                start=datetime(2025, 4, 29, 9, 0, 0),
+                end=datetime(2025, 4, 29, 23, 59, 59),
+            )
+        )
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0]["phone_number"], "+628115013798")
+
+    def test_torn_index_line(self):
+        index_path = os.path.join(self.archive_dir, "20250429.idx")
+        with open(index_path, "r") as file:
+            lines = file.readlines()
+
+        # Listrik mati saat menulis: digit terakhir panjang dan "\n" hilang
+        torn = lines[-1].rstrip("\n")[:-1]
+        with open(index_path, "w") as file:
+            file.write("".join(lines[:-1]) + torn)
+
+        result = list(sms_archive.lookup(self.archive_dir, "+628115013798"))
+        self.assertEqual(result, [])
+
+        sms_archive.append_record(
+            self.archive_dir,
+            "+628115113503",
+            "2025-04-29 10:00:00",
+            "AIN3:80.90,Normal;",
+        )
+        result = list(sms_archive.lookup(self.archive_dir, "+628115113503"))
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0]["message"], "AIN3:80.90,Normal;")
+        self.assertEqual(
+            len(list(sms_archive.lookup(self.archive_dir, "+628115113510"))), 2
+        )
+
+    def test_corrupt_record_skipped(self):
+        index_path = os.path.join(self.archive_dir, "20250429.idx")
+        with open(index_path, "a") as file:
+            file.write("2025-04-29 11:00:00\t+628115113503\t0\t4\n")
+
+        result = list(sms_archive.lookup(self.archive_dir, "+628115113503"))
+        self.assertEqual(result, [])
+
+    def test_archive_sms_removes_file(self):
+        filepath = os.path.join(self.tmpdir, "20250501_080042_+628115113503.txt")
+        with open(filepath, "w") as file:
+            file.write("AIN3:80.90,Normal;")
+
+        self.assertTrue(
+            sms_archive.archive_sms(
+                self.archive_dir, filepath, "+628115113503", "2025-05-01 08:00:42"
+            )
+        )
+        self.assertFalse(os.path.exists(filepath))
+
+        result = list(sms_archive.lookup(self.archive_dir, "+628115113503"))
+        self.assertEqual(result[0]["message"], "AIN3:80.90,Normal;")
+        self.assertEqual(result[0]["filename"], os.path.basename(filepath))
+
+    def test_archive_sms_retry_does_not_duplicate(self):
+        filepath = os.path.join(self.tmpdir, "20250501_080042_+628115113503.txt")
+        with open(filepath, "w") as file:
+            file.write("AIN3:80.90,Normal;")
+
+        # Record sudah tertulis, tapi file gagal dihapus
+        with mock.patch("sms_archive.os.remove", side_effect=PermissionError):
+            self.assertFalse(
+                sms_archive.archive_sms(
+                    self.archive_dir, filepath, "+628115113503", "2025-05-01 08:00:42"
+                )
+            )
+        self.assertTrue(os.path.exists(filepath))
+
+        self.assertTrue(
+            sms_archive.archive_sms(
+                self.archive_dir, filepath, "+628115113503", "2025-05-01 08:00:42"
+            )
+        )
+        self.assertFalse(os.path.exists(filepath))
+        result = list(sms_archive.lookup(self.archive_dir, "+628115113503"))
+        self.assertEqual(len(result), 1)
+
+    def test_migrate_folder(self):
+        sended = os.path.join(self.tmpdir, "sended")
+        os.makedirs(sended)
+        with open(os.path.join(sended, "20250502_101500_+628115113503.txt"), "w") as f:
+            f.write("AIN0:1.00,Normal;")
+
+        self.assertEqual(
+            sms_archive.migrate_folder(self.archive_dir, sended), (1, 0, False)
+        )
+        self.assertEqual(os.listdir(sended), [])
+
+        result = list(sms_archive.lookup(self.archive_dir, "+628115113503"))
+        self.assertEqual(result[0]["timestamp"], "2025-05-02 10:15:00")
+
+    def test_migrate_folder_in_batches(self):
+        sended = os.path.join(self.tmpdir, "sended")
+        os.makedirs(sended)
+        for second in range(5):
+            name = f"20250502_1015{second:02d}_+628115113503.txt"
+            with open(os.path.join(sended, name), "w") as f:
+                f.write("AIN0:1.00,Normal;")
+
+        migrate = sms_archive.migrate_folder
+        self.assertEqual(migrate(self.archive_dir, sended, 2), (2, 0, True))
+        self.assertEqual(len(os.listdir(sended)), 3)
+        self.assertEqual(migrate(self.archive_dir, sended, 2), (2, 0, True))
+        self.assertEqual(migrate(self.archive_dir, sended, 2), (1, 0, False))
+        self.assertEqual(migrate(self.archive_dir, sended, 2), (0, 0, False))
+
+    def test_migrate_folder_recovers_after_failure(self):
+        sended = os.path.join(self.tmpdir, "sended")
+        os.makedirs(sended)
+        for second in range(3):
+            name = f"20250502_1015{second:02d}_+628115113503.txt"
+            with open(os.path.join(sended, name), "w") as f:
+                f.write("AIN0:1.00,Normal;")
+
+        # SD card penuh: batch berhenti dan masih ada sisa
+        disk_full = OSError(28, "No space left on device")
+        with mock.patch("sms_archive.append_record", side_effect=disk_full):
+            self.assertEqual(
+                sms_archive.migrate_folder(self.archive_dir, sended, 2), (0, 1, True)
+            )
+        self.assertEqual(len(os.listdir(sended)), 3)
+
+        self.assertEqual(
+            sms_archive.migrate_folder(self.archive_dir, sended, 5), (3, 0, False)
+        )
+        self.assertEqual(os.listdir(sended), [])
+        result = list(sms_archive.lookup(self.archive_dir, "+628115113503"))
+        self.assertEqual(len(result), 3)
+
+    def test_migrate_folder_quarantines_bad_files(self):
+        sended = os.path.join(self.tmpdir, "sended")
+        os.makedirs(sended)
+        with open(os.path.join(sended, "catatan.txt"), "w") as f:
+            f.write("bukan SMS")
+        with open(os.path.join(sended, "20250502_101500_+628115113503.txt"), "wb") as f:
+            f.write(b"\xff\xfe")
+        with open(os.path.join(sended, "20250502_101501_+628115113503.txt"), "w") as f:
+            f.write("AIN0:1.00,Normal;")
+
+        self.assertEqual(
+            sms_archive.migrate_folder(self.archive_dir, sended, 2), (1, 0, False)
+        )
+        self.assertEqual(os.listdir(sended), ["rusak"])
+        self.assertEqual(len(os.listdir(os.path.join(sended, "rusak"))), 2)
+
+    def test_export_csv(self):
+        output = os.path.join(self.tmpdir, "export.csv")
+        count = sms_archive.export_csv(
+            self.archive_dir, output, phone_number="+628115113510"
+        )
+        self.assertEqual(count, 2)
+        with open(output) as file:
+            self.assertTrue(file.readline().startswith("timestamp,phone_number"))
+
+    def test_apply_retention(self):
+        removed = sms_archive.apply_retention(
+            self.archive_dir, 1, now=datetime(2025, 5, 1, 0, 0, 0)
+        )
+        self.assertEqual(removed, 1)
+        self.assertEqual(
+            sorted(os.listdir(self.archive_dir)), ["20250430.idx", "20250430.seg"]
+        )
+        self.assertEqual(sms_archive.apply_retention(self.archive_dir, None), 0)
+
+    def test_apply_retention_logs_errors(self):
+        with mock.patch("sms_archive.os.remove", side_effect=PermissionError):
+            removed = sms_archive.apply_retention(
+                self.archive_dir, 1, now=datetime(2025, 5, 2, 0, 0, 0)
+            )
+        self.assertEqual(removed, 0)
+        self.assertEqual(len(os.listdir(self.archive_dir)), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()